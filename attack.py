@@ -3,6 +3,7 @@ from guess import *
 import argparse
 import os
 from intel import load_keywords
+from template import Template, position_distribution
 
 def main():
     # # 每次运行开始时清空guess.txt文件
@@ -15,6 +16,8 @@ def main():
     parser.add_argument('--seed', type=int, default=2, help='random seed')
     parser.add_argument('--order', type=int, default=3, help='')
     parser.add_argument('--intel_path', type=str, default='data/keywords.txt', help='path to keywords file')
+    parser.add_argument('--position_bins', type=int, default=0, help='position bins of keyword templates, 0 to disable')
+    parser.add_argument('--template_thre', type=float, default=1e-7, help='minimum probability of keyword template candidates')
     opt = parser.parse_args()
 
     start_symbol = '#' * opt.order # 开始标识
@@ -34,23 +37,14 @@ def main():
     # 加载情报关键词
     keywords = load_keywords(opt.intel_path)
 
-    guesser = Guess(base, start_symbol, opt.order, testpd, keywords)
-
-    n = opt.number / 2
-    m = 100000
-    thre = threhold(m,n)
-    guesser.initqueue(thre[0]) # 把起始符号后的第一个字符加入队列
-
-    with open('order{}/memory.txt'.format(opt.order),'w+') as f:
-        num = 0
-        k = 0
-        while guesser.flag: # 当队列不为空时，继续猜测
-            k = int(guesser.true_guess / m)
-            guesser.insertqueue(thre[k]) # 插入新的猜测序列到队列
-            num += 1
-            if num % 1000 == 0:
-                f.write(str(guesser.true_guess) + ' / ' + str(guesser.num_guess) + '\n')
-                print("GUESS: {} / {}".format(guesser.true_guess, guesser.num_guess))
+    # 按关键词在训练集中的位置分布生成模板候选（可选）
+    templates = None
+    if opt.position_bins > 0:
+        position_dist = position_distribution('data/trainword.txt', keywords, opt.position_bins)
+        templates = Template(base, start_symbol, opt.order, keywords, position_dist, opt.position_bins, opt.template_thre).generate()
+
+    guesser = Guess(base, start_symbol, opt.order, testpd, keywords, templates=templates)
+    crack(guesser, opt.number, 'order{}/memory.txt'.format(opt.order))
 
 if __name__ == "__main__":
 
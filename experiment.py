@@ -0,0 +1,181 @@
+''' 网格实验：在 阶数 × 随机种子 × 样本量 × 关键词文件 的组合上批量运行猜测 '''
+
+from train import readpass, split, loadpass, statistic, laplace
+from guess import Guess, testpass, crack
+from intel import load_keywords
+from multiprocessing import Pool
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import traceback
+
+# 文件名加完整路径的哈希，不同目录下的同名文件得到不同的标记
+def file_tag(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return '{}_{}'.format(stem, hashlib.md5(os.path.abspath(path).encode()).hexdigest()[:8])
+
+# 每个 (口令文件, seed, number) 的训练集和测试集单独存放，避免不同运行互相覆盖 data/trainword.txt
+def split_paths(out, path, seed, number):
+    d = os.path.join(out, 'splits', file_tag(path), 'seed{}_{}'.format(seed, number))
+    return d, os.path.join(d, 'trainword.txt'), os.path.join(d, 'testword.txt')
+
+# 模型按口令文件分目录缓存，不同口令文件不会误用彼此的模型
+def model_path(out, path, order, seed, number):
+    return os.path.join(out, 'models', file_tag(path), 'order{}_{}_{}.pickle'.format(order, seed, number))
+
+# 关键词文件在运行名中的标记，'none' 表示不使用关键词
+def intel_tag(intel_path):
+    if intel_path == 'none':
+        return 'none'
+    return file_tag(intel_path)
+
+def run_name(path, order, seed, number, intel_path):
+    return '{}_order{}_seed{}_{}_{}'.format(file_tag(path), order, seed, number, intel_tag(intel_path))
+
+# 切分数据集并训练模型
+def prepare(opt):
+    '''
+    原始口令文件最多读取一次；每个 (口令文件, seed, number) 只切分一次；
+    每个训练集只读取一次，频数在各阶数之间共享；已存在的模型直接复用。
+    关键词只影响猜测阶段，所以同一 (order, seed, number) 的模型被所有关键词文件共享。
+    '''
+    passwd = None
+    for seed in opt.seeds:
+        for number in opt.numbers:
+            d, train_path, test_path = split_paths(opt.out, opt.path, seed, number)
+            if not (os.path.exists(train_path) and os.path.exists(test_path)):
+                if passwd is None:
+                    print("Loading Password File ...")
+                    passwd = readpass(opt.path)
+                os.makedirs(d, exist_ok=True)
+                # 先写临时文件再替换，中断时不会留下被当作缓存复用的残缺文件
+                split(passwd, seed, number, train_path + '.tmp', test_path + '.tmp')
+                os.replace(test_path + '.tmp', test_path)
+                os.replace(train_path + '.tmp', train_path)
+
+            todo = [order for order in opt.orders if not os.path.exists(model_path(opt.out, opt.path, order, seed, number))]
+            if not todo:
+                continue
+            counts = loadpass(train_path, '') # 不带起始符号的口令频数，各阶数共享
+            for order in todo:
+                print("Training order {} (seed {}, number {}) ...".format(order, seed, number))
+                start_symbol = '#' * order
+                base = statistic({start_symbol + k: v for k, v in counts.items()}, order)
+                mpath = model_path(opt.out, opt.path, order, seed, number)
+                os.makedirs(os.path.dirname(mpath), exist_ok=True)
+                laplace(base, order, seed, number, mpath + '.tmp')
+                os.replace(mpath + '.tmp', mpath)
+
+# 进程池中执行的单个猜测任务，所有输出写入自己的运行目录；返回 (cell, 错误信息)，成功时错误信息为 None
+def run(cell):
+    try:
+        guess(cell)
+    except Exception:
+        return cell, traceback.format_exc()
+    return cell, None
+
+def guess(cell):
+    path, order, seed, number, intel_path, run_dir, test_path, mpath = cell
+    os.makedirs(run_dir, exist_ok=True)
+    guess_path = os.path.join(run_dir, 'guess.txt')
+    with open(guess_path, 'w') as f:
+        pass
+
+    with open(mpath, 'rb') as file:
+        base = pickle.load(file)
+    keywords = [] if intel_path == 'none' else load_keywords(intel_path)
+
+    guesser = Guess(base, '#' * order, order, testpass(test_path), keywords, guess_path)
+    crack(guesser, number, os.path.join(run_dir, 'memory.txt'))
+
+# 读取 memory.txt，返回 [[true_guess, num_guess], ...]
+def read_memory(path):
+    curve = []
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.strip().split(' / ')
+            if len(parts) != 2:
+                continue
+            curve.append([int(parts[0]), int(parts[1])])
+    return curve
+
+# 把各运行的曲线汇总到 results.json，同名运行覆盖旧结果
+def aggregate(cells, results_path):
+    results = {}
+    if os.path.exists(results_path):
+        with open(results_path, 'r') as f:
+            results = {r['name']: r for r in json.load(f)['runs']}
+
+    for path, order, seed, number, intel_path, run_dir, test_path, mpath in cells:
+        memory_path = os.path.join(run_dir, 'memory.txt')
+        if not os.path.exists(memory_path):
+            continue
+        name = run_name(path, order, seed, number, intel_path)
+        results[name] = {
+            'name': name,
+            'path': path,
+            'order': order,
+            'seed': seed,
+            'number': number,
+            'intel_path': intel_path,
+            'curve': read_memory(memory_path),
+        }
+
+    with open(results_path, 'w') as f:
+        json.dump({'runs': sorted(results.values(), key=lambda r: r['name'])}, f, indent=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Markov-based Password Cracking Experiment Grid")
+    parser.add_argument('--path', type=str, default='data/rockyou.txt', help='the path of password file')
+    parser.add_argument('--orders', type=int, nargs='+', default=[3, 4, 5], help='markov orders')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[2], help='random seeds')
+    parser.add_argument('--numbers', type=int, nargs='+', default=[2000000], help='the totals of train and test simpled from password file')
+    parser.add_argument('--intel_paths', type=str, nargs='+', default=['data/keywords.txt'], help="keywords files, 'none' for no keywords")
+    parser.add_argument('--out', type=str, default='experiments', help='output directory of splits, runs and results.json')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of guessing processes')
+    opt = parser.parse_args()
+
+    # 重复给出的参数只运行一次，保证每个组合的运行名互不相同
+    opt.orders = list(dict.fromkeys(opt.orders))
+    opt.seeds = list(dict.fromkeys(opt.seeds))
+    opt.numbers = list(dict.fromkeys(opt.numbers))
+    opt.intel_paths = list(dict.fromkeys(p if p == 'none' else os.path.normpath(p) for p in opt.intel_paths))
+
+    prepare(opt)
+
+    cells = []
+    for seed in opt.seeds:
+        for number in opt.numbers:
+            test_path = split_paths(opt.out, opt.path, seed, number)[2]
+            for order in opt.orders:
+                mpath = model_path(opt.out, opt.path, order, seed, number)
+                for intel_path in opt.intel_paths:
+                    run_dir = os.path.join(opt.out, 'runs', run_name(opt.path, order, seed, number, intel_path))
+                    cells.append((opt.path, order, seed, number, intel_path, run_dir, test_path, mpath))
+
+    print("Guessing Password ({} runs) ...".format(len(cells)))
+    finished = []
+    failed = []
+    results_path = os.path.join(opt.out, 'results.json')
+    try:
+        with Pool(max(1, min(opt.workers, len(cells)))) as pool:
+            for cell, error in pool.imap_unordered(run, cells):
+                if error is None:
+                    finished.append(cell)
+                    print("Finished:", cell[5])
+                else:
+                    failed.append(cell)
+                    print("Failed:", cell[5])
+                    print(error)
+    finally:
+        # 只汇总已完成的运行，中途失败或被中断时已完成的曲线也不会丢失
+        aggregate(finished, results_path)
+        print("结果已汇总至", results_path)
+        for cell in failed:
+            print("运行失败:", cell[5])
+
+if __name__ == "__main__":
+
+    main()
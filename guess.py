@@ -27,9 +27,28 @@ def threhold(m, n):
         thre.append(p)
     return thre
 
+# 猜测主循环：按阈值不断扩展队列，并周期性地把 true_guess / num_guess 记录到memory_path
+def crack(guesser, number, memory_path):
+    n = number / 2
+    m = 100000
+    thre = threhold(m,n)
+    guesser.initqueue(thre[0]) # 把起始符号后的第一个字符加入队列
+
+    with open(memory_path,'w+') as f:
+        num = 0
+        k = 0
+        while guesser.flag: # 当队列不为空时，继续猜测
+            k = int(guesser.true_guess / m)
+            guesser.insertqueue(thre[k]) # 插入新的猜测序列到队列
+            num += 1
+            if num % 1000 == 0:
+                f.write(str(guesser.true_guess) + ' / ' + str(guesser.num_guess) + '\n')
+                print("GUESS: {} / {}".format(guesser.true_guess, guesser.num_guess))
+        f.write(str(guesser.true_guess) + ' / ' + str(guesser.num_guess) + '\n') # 记录最终结果
+
 class Guess():
 
-    def __init__(self, base, start_symbol, order, testpd, keywords=None):
+    def __init__(self, base, start_symbol, order, testpd, keywords=None, guess_path='guess.txt', templates=None):
 
         self.base = base
         self.start_symbol = start_symbol
@@ -39,6 +58,7 @@ class Guess():
         self.true_guess = 0  # 猜测正确的次数
         self.flag = 1
         self.testpd = testpd
+        self.guess_path = guess_path  # 猜测输出文件，并行实验时每个运行使用独立路径
         self.keywords = keywords or []
         self.processed_kw = set()  # 记录已处理的关键词避免重复
 
@@ -55,6 +75,10 @@ class Guess():
         self.max_keyword_variants = 500  # 每个关键词的最大变体生成数
         self.keyword_variant_counts = {kw: 0 for kw in (keywords or [])}  # 变体计数
 
+        # 位置模板（可选）：Template.generate() 按概率降序产生的 (口令, 概率)，与队列按概率合并输出
+        self.templates = templates
+        self.next_template = next(templates, None) if templates is not None else None
+
     # 初始化队列。从起始符号开始，生成初始的密码前缀序列，放入优先队列
     def initqueue(self, thre):
         ''' 加入关键词(可选) '''
@@ -108,13 +132,31 @@ class Guess():
         #     return
 
         # 终止条件：队列空或总猜测次数超过 100 万
-        if len(self.queue) == 0 or self.num_guess > 1000000:
+        if (len(self.queue) == 0 and self.next_template is None) or self.num_guess > 1000000:
             print("所有的可能的猜测已经输出")
             print("正确猜测:", self.true_guess)
             print("总猜测:", self.num_guess)
             self.flag = 0
             return
 
+        # 1. 模板候选的概率不低于队首时，优先输出模板候选
+        if self.next_template is not None and (len(self.queue) == 0 or self.next_template[1] >= self.queue[0][0]):
+            pwd, prob = self.next_template
+            self.next_template = next(self.templates, None)
+            if pwd in self.guessed_pwds: # 去重检查
+                return
+            self.num_guess += 1
+            with open(self.guess_path, 'a+') as file: # 记录猜测
+                file.write(pwd + '\t' + str(prob) + '\n')
+            self.guessed_pwds.add(pwd)  # 记录已生成
+
+            if pwd in self.testpd: # 验证，模板候选都包含关键词
+                hit_count = self.testpd[pwd]
+                self.true_guess += hit_count
+                self.keyword_true_guess += hit_count
+                del self.testpd[pwd]
+            return
+
         qobject = self.queue.pop(0)  # 从队首取出最高概率的元素
         current_seq = qobject[1]
         current_prob = qobject[0]
@@ -130,7 +172,7 @@ class Guess():
                 continue
             if kw in current_pwd and kw not in self.processed_kw:
                 self.num_guess += 1
-                with open('guess.txt', 'a+') as f:
+                with open(self.guess_path, 'a+') as f:
                     f.write(f"{current_pwd}\t{current_prob}\n")
                 self.guessed_pwds.add(current_pwd)  # 记录已生成
 
@@ -186,7 +228,7 @@ class Guess():
                         if pwd in self.guessed_pwds:
                             continue
                         self.num_guess += 1
-                        with open('guess.txt', 'a+') as file: # 记录猜测
+                        with open(self.guess_path, 'a+') as file: # 记录猜测
                             file.write(pwd+ '\t' + str(current_prob) + '\n')
                         self.guessed_pwds.add(pwd)  # 记录已生成
 
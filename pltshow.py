@@ -1,4 +1,6 @@
 import matplotlib.pyplot as plt
+import argparse
+import json
 import os
 import numpy as np
 
@@ -25,12 +27,18 @@ def load_data(order):
             true_guesses.append(tg)
             num_guesses.append(ng)
     
+    return normalize(num_guesses, true_guesses)
+
+# 把 true_guess / num_guess 序列换算为绘图所需的比例
+def normalize(num_guesses, true_guesses):
     if not num_guesses or not true_guesses:
         return None
     
     # 计算最大猜测数和最大正确猜测数（作为测试集总数）
     max_num = max(num_guesses)
     max_true = max(true_guesses)
+    if max_num == 0: # 没有产生任何猜测的运行（memory.txt 只有 0 / 0）不绘制
+        return None
     
     # 计算比例
     guess_ratios = [ng / max_num for ng in num_guesses]
@@ -38,27 +46,42 @@ def load_data(order):
     
     return (guess_ratios, cracked_percentages, max_num, max_true)
 
+# 读取 experiment.py 汇总的 results.json，返回 {运行名: 绘图数据}
+def load_results(results_path):
+    with open(results_path, 'r') as f:
+        runs = json.load(f)['runs']
+    data = {}
+    for r in runs:
+        res = normalize([c[1] for c in r['curve']], [c[0] for c in r['curve']])
+        if res:
+            data[r['name']] = res
+    return data
+
+parser = argparse.ArgumentParser(description="Plot password cracking performance")
+parser.add_argument('--results', type=str, default=None, help='results.json written by experiment.py; defaults to order{3,4,5}/memory.txt')
+opt = parser.parse_args()
+
 # 准备要绘制的阶数
-orders = [3, 4, 5]
 data = {}
-
-for order in orders:
-    res = load_data(order)
-    if res:
-        data[order] = res
+if opt.results:
+    data = load_results(opt.results)
+else:
+    orders = [3, 4, 5]
+    for order in orders:
+        res = load_data(order)
+        if res:
+            data[f'Order {order}'] = res
 
 # 定义要显示的横轴点
 target_ratios = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
 
 # 绘图设置
 plt.figure(figsize=(10, 6))
-markers = ['o', 's', '^']
-colors = ['r', 'g', 'b']
+markers = ['o', 's', '^', 'D', 'v', 'x']
+colors = ['r', 'g', 'b', 'c', 'm', 'y', 'k']  # 与 markers 的长度互质，前 42 条曲线的颜色和标记组合互不相同
 
-for i, order in enumerate(orders):
-    if order not in data:
-        continue
-    guess_ratios, cracked_percentages, max_num, max_true = data[order]
+for i, (label, res) in enumerate(data.items()):
+    guess_ratios, cracked_percentages, max_num, max_true = res
     
     # 对数据排序
     sorted_pairs = sorted(zip(guess_ratios, cracked_percentages))
@@ -70,9 +93,9 @@ for i, order in enumerate(orders):
     
     # 绘制曲线
     plt.plot(guess_ratios_sorted, cracked_percentages_sorted, 
-             label=f'Order {order}', 
-             color=colors[i], 
-             marker=markers[i], 
+             label=label, 
+             color=colors[i % len(colors)], 
+             marker=markers[i % len(markers)], 
              markersize=5, 
              linestyle='-', 
              linewidth=2)
@@ -80,13 +103,17 @@ for i, order in enumerate(orders):
 # 图表设置
 plt.xlabel('Guesses (Ratio)', fontsize=12)
 plt.ylabel('Cracked Percentage (%)', fontsize=12)
-plt.title('Password Cracking Performance by Markov Order', fontsize=14)
 plt.xlim(0, 1.0)
-plt.ylim(0, 50)
 plt.xticks(target_ratios, [f'{x:.1f}' for x in target_ratios])
-plt.yticks(range(0, 51, 10))
+if opt.results:
+    plt.title('Password Cracking Performance', fontsize=14)
+    plt.ylim(bottom=0) # 实验网格的曲线范围不固定，上限自动确定
+else:
+    plt.title('Password Cracking Performance by Markov Order', fontsize=14)
+    plt.ylim(0, 50)
+    plt.yticks(range(0, 51, 10))
 plt.grid(True, linestyle='--', alpha=0.7)
-plt.legend(fontsize=12)
+plt.legend(fontsize=12 if len(data) <= 6 else 8)
 plt.tight_layout()
 # plt.show()
 plt.savefig('cracking_performance.png', dpi=300)  # 保存为图片
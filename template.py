@@ -0,0 +1,228 @@
+''' 基于关键词位置分布的模板生成：前缀填充 + 关键词 + 后缀填充 '''
+
+from extract_password_keywords import read_passwords, count_keyword_positions, generate_position_distribution
+import heapq
+import itertools
+
+# 统计关键词在训练集中的位置分布
+def position_distribution(path, keywords, bins=3):
+    '''
+    输入：训练集路径、关键词列表、位置区间数量
+    输出：{(lower, upper): probability}，与 generate_position_distribution 的格式一致
+    read_passwords 会把口令转为小写，所以关键词也按小写统计
+    '''
+    pos_ratios = count_keyword_positions(read_passwords(path), [(kw.lower(), 0) for kw in keywords])
+    return generate_position_distribution(pos_ratios, bins)
+
+class Segments():
+    '''
+    从前缀 ctx 出发的填充片段表，按概率降序惰性展开。
+    end 为 True 时片段必须以结束符结尾（后缀），否则不包含结束符（前缀，含空片段）。
+    weight(片段) 为可选的附加概率（如关键词跟在前缀之后的概率），bound 为它的上界。
+
+    堆中的节点项是某个片段的第 k 个后续字符，键为它的概率乘以 bound，是整棵子树的上界；
+    弹出节点时只压入它的下一个兄弟、第一个子节点和它自身的片段项（键为精确概率），
+    由于 base 中的后续字符已按概率降序排列，片段项的弹出顺序就是概率降序，
+    堆的大小与已展开的项数成正比。
+    '''
+
+    def __init__(self, base, order, ctx, end, thre, max_filler, weight=None, bound=1.0):
+
+        self.base = base
+        self.order = order
+        self.end = end
+        self.thre = thre
+        self.max_filler = max_filler
+        self.weight = weight
+        self.bound = bound
+        self.items = []  # 已展开的 [(片段, 概率), ...]，按概率降序
+        self.tie = itertools.count()
+        self.heap = [] # [-键, tie, 片段, 前缀, 片段概率, 后续字符下标]，下标为 None 时表示片段项
+        if not end:
+            self.push_item('', 1.0)
+        self.push('', ctx, 1.0, 0)
+
+    def push(self, seg, ctx, p, k):
+        bs = self.base.get(ctx, [])
+        if k < len(bs) and p * bs[k][1] * self.bound >= self.thre:
+            heapq.heappush(self.heap, (-p * bs[k][1] * self.bound, next(self.tie), seg, ctx, p, k))
+
+    def push_item(self, seg, p):
+        if self.weight is not None:
+            p *= self.weight(seg)
+        if p >= self.thre:
+            heapq.heappush(self.heap, (-p, next(self.tie), seg, None, p, None))
+
+    # 返回第 i 个片段，不存在时返回 None；只展开到需要的位置
+    def get(self, i):
+        while len(self.items) <= i and self.heap:
+            neg, _, seg, ctx, p, k = heapq.heappop(self.heap)
+            if k is None:
+                self.items.append((seg, p))
+                continue
+            self.push(seg, ctx, p, k + 1) # 下一个兄弟
+            c, q = self.base[ctx][k]
+            q *= p
+            if c == '\n':
+                if self.end:
+                    self.push_item(seg, q)
+                continue
+            if len(seg) >= self.max_filler:
+                continue
+            seg += c
+            if not self.end:
+                self.push_item(seg, q)
+            if self.end or len(seg) < self.max_filler: # 前缀达到最大长度后不再需要子节点
+                self.push(seg, (ctx + c)[-self.order:], q, 0) # 第一个子节点
+        return self.items[i] if i < len(self.items) else None
+
+class Template():
+    '''
+    候选口令 = 前缀填充 + 关键词 + 后缀填充，概率为
+        P(关键词起始位置所在区间) * P(前缀 | 起始符号) * P(关键词 | 前缀) * P(后缀 + 结束符 | 关键词)
+    前缀、关键词和后缀的概率由马尔可夫模型给出，与 Guess 队列中的概率可以直接比较。
+
+    每个关键词有一张按 P(前缀) * P(关键词 | 前缀) 降序展开的前缀表；后缀表按 起始符号 + 前缀 + 关键词 的
+    最后 order 个字符缓存，关键词短于 order 时不同前缀会用到不同的后缀表。
+    关键词对应一条 (前缀下标, 后缀下标) 的惰性流，流内按两者乘积降序展开，乘以最大的位置概率作为流的上界；
+    全局堆中只保存每条流的上界和已展开但尚未输出的候选，片段表本身也按需展开，
+    因此内存与搜索前沿成正比，而不是 关键词 × 位置 × 填充 的组合数。
+    '''
+
+    def __init__(self, base, start_symbol, order, keywords, position_dist, bins, thre=1e-7, max_filler=6):
+
+        self.base = base
+        self.start_symbol = start_symbol
+        self.order = order
+        self.keywords = [kw for kw in keywords if kw]
+        self.position_dist = position_dist
+        self.bins = bins  # 与 position_distribution 使用的区间数量一致
+        self.thre = thre  # 候选口令的最低概率，同时用于裁剪片段表
+        self.max_filler = max_filler  # 前缀/后缀填充的最大长度
+        self.min_len = 4  # 与 Guess 中的长度要求一致
+        self.max_len = 20  # 与 preprocess 的过滤条件一致
+
+        self.pmax = max(position_dist.values())
+        self.suffix_tables = {}  # 以后缀的上下文为键缓存后缀片段表
+        self.probs = {}  # 按需缓存 base 中每个前缀的 {字符: 概率}，避免反复查找列表
+
+    def prefix_table(self, kw, bound):
+        return Segments(self.base, self.order, self.start_symbol, False, self.thre, self.max_filler,
+                        lambda prefix: self.keyword_prob(prefix, kw), bound)
+
+    def suffix_table(self, prefix, kw):
+        ctx = (self.start_symbol + prefix + kw)[-self.order:]
+        if ctx not in self.suffix_tables:
+            self.suffix_tables[ctx] = Segments(self.base, self.order, ctx, True, self.thre, self.max_filler)
+        return self.suffix_tables[ctx]
+
+    # 关键词起始位置占口令长度的比例所在区间的概率
+    def position_prob(self, start, length):
+        i = min(int(start / length * self.bins), self.bins - 1)
+        lower = round(i / self.bins, 4)
+        upper = 1.0 if i == self.bins - 1 else round((i + 1) / self.bins, 4)
+        return self.position_dist.get((lower, upper), 0.0)
+
+    # 前缀 ctx 之后出现字符 c 的马尔可夫概率；模型中不存在的转移概率为 0，与 Guess 的普通扩展一致
+    def prob(self, ctx, c):
+        d = self.probs.get(ctx)
+        if d is None:
+            d = self.probs[ctx] = dict(self.base.get(ctx, []))
+        return d.get(c, 0.0)
+
+    # 关键词紧跟在前缀之后的马尔可夫概率
+    def keyword_prob(self, prefix, kw):
+        seq = self.start_symbol + prefix
+        p = 1.0
+        for c in kw:
+            p *= self.prob(seq[-self.order:], c)
+            if p == 0.0:
+                break
+            seq += c
+        return p
+
+    # 每个关键词的 keyword_prob 对任意前缀的上界：
+    # 前 order 个字符的概率与前缀有关，取所有以已有关键词字符结尾的前缀中的最大值（只遍历一次 base）；
+    # 之后的字符前缀完全由关键词决定，直接取马尔可夫概率
+    def keyword_bounds(self):
+        need = {} # 关键词的前 t 个字符 -> 需要求上界的第 t+1 个字符
+        for kw in self.keywords:
+            for t in range(min(self.order, len(kw))):
+                need.setdefault(kw[:t], set()).add(kw[t])
+        maxp = {}
+        for ctx, bs in self.base.items():
+            tails = [ctx[len(ctx) - l:] for l in range(self.order) if ctx[len(ctx) - l:] in need]
+            for b, q in bs:
+                for tail in tails:
+                    if b in need[tail] and q > maxp.get((tail, b), 0.0):
+                        maxp[(tail, b)] = q
+
+        bounds = {}
+        for kw in self.keywords:
+            p = 1.0
+            for t, c in enumerate(kw):
+                if t < self.order:
+                    p *= maxp.get((kw[:t], c), 0.0)
+                else:
+                    p *= self.prob(kw[t - self.order:t], c)
+            bounds[kw] = p
+        return bounds
+
+    # 按组合概率降序惰性生成 (口令, 概率)；不同拆分可能得到同一口令，去重由调用方负责
+    def generate(self):
+        tie = itertools.count()
+        streams = []
+        heap = [] # [-概率, tie, 流编号, 口令]，口令为 None 时表示流的上界
+        for kw, bound in self.keyword_bounds().items():
+            if bound * self.pmax < self.thre:
+                continue
+            prefixes = self.prefix_table(kw, bound)
+            first = prefixes.get(0)
+            if first is None:
+                continue
+            # 后缀概率的上界：关键词不短于 order 时所有前缀共享同一张后缀表，取它的最大概率；否则取 1
+            if len(kw) >= self.order:
+                best = self.suffix_table('', kw).get(0)
+                if best is None:
+                    continue
+                sbound = best[1]
+            else:
+                sbound = 1.0
+            p = first[1] * sbound
+            if p * self.pmax < self.thre:
+                continue
+            streams.append((kw, prefixes, sbound, [(-p, 0, -1)]))
+            heapq.heappush(heap, (-p * self.pmax, next(tie), len(streams) - 1, None))
+
+        while heap:
+            neg, _, idx, pwd = heapq.heappop(heap)
+            if pwd is not None:
+                yield pwd, -neg
+                continue
+
+            kw, prefixes, sbound, frontier = streams[idx]
+            p, i, j = heapq.heappop(frontier)
+            prefix, pp = prefixes.get(i)
+            suffixes = self.suffix_table(prefix, kw)
+            if j < 0:
+                # 第 i 个前缀以 P(前缀) * sbound 为上界进入前沿，弹出时才取它自己的后缀表，并引入下一个前缀；
+                # 前沿中每一项都不大于产生它的项，流内仍按降序输出
+                nxt = prefixes.get(i + 1)
+                if nxt is not None and nxt[1] * sbound * self.pmax >= self.thre:
+                    heapq.heappush(frontier, (-nxt[1] * sbound, i + 1, -1))
+                best = suffixes.get(0)
+                if best is not None and pp * best[1] * self.pmax >= self.thre:
+                    heapq.heappush(frontier, (-pp * best[1], i, 0))
+            else:
+                nxt = suffixes.get(j + 1)
+                if nxt is not None and pp * nxt[1] * self.pmax >= self.thre:
+                    heapq.heappush(frontier, (-pp * nxt[1], i, j + 1))
+
+                # 位置概率不超过 pmax，流的上界 p * pmax 成立
+                candidate = prefix + kw + suffixes.get(j)[0]
+                if self.min_len <= len(candidate) <= self.max_len:
+                    score = -p * self.position_prob(len(prefix), len(candidate))
+                    if score >= self.thre:
+                        heapq.heappush(heap, (-score, next(tie), idx, candidate))
+            if frontier:
+                heapq.heappush(heap, (frontier[0][0] * self.pmax, next(tie), idx, None))
@@ -4,11 +4,11 @@ import re
 import random
 import pickle
 
-# 读取数据集预处理, 并且分割为训练集和测试集
-def preprocess(path, seed, number = 2000000):
+# 读取原始口令文件，过滤非法口令，并按出现次数展开
+def readpass(path):
     '''
-    输入：原始密码文件路径、随机种子、总样本量
-    输出：trainword.txt（训练集）、testword.txt（测试集）
+    输入：原始密码文件路径（rockyou-withcount格式）
+    输出：密码列表（每个密码按出现次数重复）
     '''
     passwd = []
     exp = re.compile(r'[^\x20-\x7e]')
@@ -26,22 +26,36 @@ def preprocess(path, seed, number = 2000000):
             except Exception:
                 #print("Exception: ",line)
                 continue
+    return passwd
 
-    # 切分数据集（训练集和测试集）
+# 切分数据集（训练集和测试集）
+def split(passwd, seed, number = 2000000, train_path = "data/trainword.txt", test_path = "data/testword.txt"):
+    '''
+    输入：readpass得到的密码列表、随机种子、总样本量、训练集和测试集的输出路径
+    输出：train_path（训练集）、test_path（测试集）
+    '''
     random.seed(seed)
     r = random.sample(range(0, len(passwd)), number)
     lt = [passwd[i] for i in r]
     testword = lt[0:int(number / 2)]
     trainword = lt[int(number / 2):]
     
-    with open("data/trainword.txt", "w") as f:
+    with open(train_path, "w") as f:
         for pd in trainword:
             f.write(pd + '\n')
         
-    with open("data/testword.txt", "w") as f:
+    with open(test_path, "w") as f:
         for pd in testword:
             f.write(pd + '\n')
 
+# 读取数据集预处理, 并且分割为训练集和测试集
+def preprocess(path, seed, number = 2000000):
+    '''
+    输入：原始密码文件路径、随机种子、总样本量
+    输出：trainword.txt（训练集）、testword.txt（测试集）
+    '''
+    split(readpass(path), seed, number)
+
 # 读取训练集，为每个密码添加 “起始符号”
 def loadpass(path, start_symbol):
 
@@ -89,10 +103,10 @@ def statistic(passwd, order):
     return base
 
 # laplace平滑和排序
-def laplace(base, order, seed, number):
+def laplace(base, order, seed, number, path=None):
     '''
     输入：步骤 3 的频数表base、模型阶数order、随机种子、样本量
-    输出：保存到本地的 n-gram 概率模型文件（.pickle格式）
+    输出：保存到本地的 n-gram 概率模型文件（.pickle格式），默认路径为 order{order}/order{order}_{seed}_{number}.pickle
     '''
 
     for key, value in base.items():
@@ -104,6 +118,8 @@ def laplace(base, order, seed, number):
         base[key] = sorted(value.items(), key=lambda t: t[1], reverse=True) # 降序排序，快速获取某个前缀后出现频率最高的字符
 
     # 保存模型
-    with open('./order{}/order{}_{}_{}.pickle'.format(order, order, seed, number), 'wb') as file:
+    if path is None:
+        path = './order{}/order{}_{}_{}.pickle'.format(order, order, seed, number)
+    with open(path, 'wb') as file:
         pickle.dump(base, file)
 